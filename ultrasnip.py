@@ -3,7 +3,9 @@
 from __future__ import print_function
 
 import sys
-from math import ceil, sqrt
+from collections import namedtuple
+from contextlib import contextmanager
+from math import hypot
 from Qt import QtWidgets, QtCore, QtGui
 
 __version__ = '0.1.1'
@@ -14,6 +16,11 @@ __email__ = 'danielbradham@gmail.com'
 __url__ = 'https://github.com/danbradham/ultrasnip'
 version_info = tuple([int(x) for x in __version__.split('.')])
 
+# Qt enums read on every paint, looked up once here
+_NO_PEN = QtCore.Qt.NoPen
+_NO_BRUSH = QtCore.Qt.NoBrush
+_ALIGN_CENTER = QtCore.Qt.AlignCenter
+
 
 class UltraSnip(QtWidgets.QDialog):
     '''The main UltraSnip Dialog. This class is used to select a section of
@@ -30,18 +37,20 @@ class UltraSnip(QtWidgets.QDialog):
 
     def __init__(self, region=None, font=None, colors=None, parent=None):
         super(UltraSnip, self).__init__(parent)
-        app = QtWidgets.QApplication.instance()
+        self._app = _app()
         self.setWindowFlags(
             QtCore.Qt.FramelessWindowHint |
             QtCore.Qt.Window
         )
         self.setAttribute(QtCore.Qt.WA_TranslucentBackground)
         self.setMouseTracking(True)
-        desktop_region = app.primaryScreen().virtualGeometry()
-        self.setGeometry(desktop_region)
+        self._virtual_geometry = self._app.primaryScreen().virtualGeometry()
+        self.setGeometry(self._virtual_geometry)
 
         # Initialize Colors
         self.theme = Theme(font=font, **(colors or {}))
+        self._bg_pixmap = None
+        self._bg_color = None
 
         # Initialize Internals
         self.region = region or QtCore.QRect()
@@ -51,6 +60,13 @@ class UltraSnip(QtWidgets.QDialog):
         self.has_zoom_manipulators = False
         self.selecting = False
         self.manipulating = False
+        self._zoom_strip = QtCore.QRect()
+        self._last_dirty = QtGui.QRegion(self.rect())
+        self._desktop_grabbed = False
+        self._repaint_timer = QtCore.QTimer(self)
+        self._repaint_timer.setSingleShot(True)
+        self._repaint_timer.setInterval(16)
+        self._repaint_timer.timeout.connect(self._update_dirty)
 
         self.widgets = WidgetGroup(
             MoveManipulator(self),
@@ -63,69 +79,81 @@ class UltraSnip(QtWidgets.QDialog):
             SideManipulator(self, 'bottom'),
             CornerManipulator(self, 'bottomLeft'),
         )
-        self.grab_desktop()
+
+    def showEvent(self, event):
+        # Grab lazily, but before the dialog is mapped so the capture
+        # doesn't include the overlay itself.
+        if not self._desktop_grabbed:
+            self.grab_desktop()
+        super(UltraSnip, self).showEvent(event)
 
     def grab_desktop(self):
         '''Grab the current virtual desktop.'''
 
-        app = QtWidgets.QApplication.instance()
-        region = app.primaryScreen().virtualGeometry()
-        pixmap = app.primaryScreen().grabWindow(
-            app.desktop().winId(),
-            region.x(),
-            region.y(),
-            region.width(),
-            region.height()
-        )
+        pixmap = capture_region(self._virtual_geometry)
         self.pixmap = pixmap
+        self._desktop_grabbed = True
         self.update_zoom_manipulators(pixmap)
 
     def update_zoom_manipulators(self, pixmap):
         '''Create or update the zoom manipulators based on the input pixmap.'''
 
+        # Convert once and share the CPU side copy between all previews
+        image = pixmap.toImage()
         if self.has_zoom_manipulators:
             for w in self.widgets.widgets:
                 if isinstance(w, ZoomManipulator):
-                    w.set_pixmap(pixmap)
+                    w.set_pixmap(pixmap, image)
             return
 
         margin = self.theme.margins
         boxsize = px(100)
         box = QtCore.QRect(0, 0, boxsize, boxsize)
-        x = lambda i: (margin * (i + 1)) + (boxsize * 0.5) + (boxsize * i)
-        y = margin + boxsize * 0.5
+        step = margin + boxsize
+        # Integer box centers so previews land on whole pixels
+        center = margin + boxsize // 2
+        xs = [center + i * step for i in range(4)]
+        y = center
+        corners = ('topLeft', 'topRight', 'bottomRight', 'bottomLeft')
         self.widgets.extend([
             ZoomManipulator(
                 self,
                 pixmap,
-                'topLeft',
-                QtCore.QPoint(x(0), y),
-                box,
-            ),
-            ZoomManipulator(
-                self,
-                pixmap,
-                'topRight',
-                QtCore.QPoint(x(1), y),
+                corner,
+                QtCore.QPoint(xs[i], y),
                 box,
-            ),
-            ZoomManipulator(
-                self,
-                pixmap,
-                'bottomRight',
-                QtCore.QPoint(x(2), y),
-                box,
-            ),
-            ZoomManipulator(
-                self,
-                pixmap,
-                'bottomLeft',
-                QtCore.QPoint(x(3), y),
-                box,
-            ),
+                image,
+            )
+            for i, corner in enumerate(corners)
         ])
+        for w in self.widgets.widgets:
+            if isinstance(w, ZoomManipulator):
+                self._zoom_strip = self._zoom_strip.united(w.bounds())
         self.has_zoom_manipulators = True
 
+    def _dirty_region(self):
+        '''Area covering the region, its handles and the zoom previews.'''
+
+        # Handles scale with the margins, the move arrows do not
+        pad = max(self.theme.margins * 3, MoveManipulator.arrow_extent) + 2
+        rect = self.region.adjusted(-pad, -pad, pad, pad)
+        # A QRegion keeps the two areas apart, their bounding rect would
+        # span most of the desktop
+        return QtGui.QRegion(rect).united(QtGui.QRegion(self._zoom_strip))
+
+    def _update_dirty(self):
+        '''Repaint the previous and current dirty regions only.'''
+
+        dirty = self._dirty_region()
+        self.update(self._last_dirty.united(dirty))
+        self._last_dirty = dirty
+
+    def _schedule_update(self):
+        '''Collapse bursts of events into one dirty update per ~60Hz frame.'''
+
+        if not self._repaint_timer.isActive():
+            self._repaint_timer.start()
+
     @property
     def global_region(self):
         if not self.selection:
@@ -147,19 +175,23 @@ class UltraSnip(QtWidgets.QDialog):
                 self.selecting = True
                 self.selection = True
 
-            self.update()
+            # A press can start a new selection anywhere - repaint it all
+            self._last_dirty = QtGui.QRegion(self.rect())
+            self._schedule_update()
 
     def mouseMoveEvent(self, event):
         if self.selecting:
             self.region = QtCore.QRect(self.origin, event.pos()).normalized()
+            self.widgets.invalidate_bounds()
 
         if self.selection:
             if self.manipulating:
                 self.widgets.active.drag(event.pos())
+                self.widgets.invalidate_bounds()
             else:
                 self.widgets.hover_at_pos(event.pos())
 
-        self.update()
+        self._schedule_update()
 
     def mouseReleaseEvent(self, event):
         self.origin = None
@@ -194,27 +226,48 @@ class UltraSnip(QtWidgets.QDialog):
         elif event.key() == QtCore.Qt.Key_Down:
             self.widgets.key_down()
 
-        self.update()
+        self.widgets.invalidate_bounds()
+        self._schedule_update()
         event.accept()
 
     def focusOutEvent(self, event):
         self.close()
         event.accept()
 
+    def background_pixmap(self):
+        '''Background filled pixmap, rebuilt when the theme color changes.'''
+
+        color = self.theme.colors['background']
+        if self._bg_pixmap is None or color != self._bg_color:
+            self._bg_pixmap = QtGui.QPixmap(self.size())
+            self._bg_pixmap.fill(color)
+            self._bg_color = QtGui.QColor(color)
+        return self._bg_pixmap
+
     def paintEvent(self, event):
         painter = QtGui.QPainter(self)
         painter.setRenderHint(painter.Antialiasing)
 
-        # Paint background
-        painter.fillRect(self.rect(), self.theme.fill('background'))
-        if self.selection:
-            painter.setCompositionMode(painter.CompositionMode_Clear)
-            painter.fillRect(self.region, self.theme.fill('empty'))
-            painter.setCompositionMode(painter.CompositionMode_SourceOver)
-            painter.fillRect(self.region, self.theme.fill('foreground'))
+        # Paint background, only the rects of the dirty region, since its
+        # bounding rect spans everything between the old and new selection
+        dirty = event.region()
+        background = self.background_pixmap()
+        if self.selection and not self.region.isEmpty():
+            # Paint the background only outside of the selection so the
+            # foreground never has to replace it.
+            foreground = self.theme.fill('foreground')
+            for rect in dirty.rects():
+                hole = self.region.intersected(rect)
+                for band in subtract_rect(rect, hole):
+                    painter.drawPixmap(band, background, band)
+                if not hole.isEmpty():
+                    painter.fillRect(hole, foreground)
 
             # Paint widgets
-            self.widgets.paint(painter)
+            self.widgets.paint(painter, dirty)
+        else:
+            for rect in dirty.rects():
+                painter.drawPixmap(rect, background, rect)
 
         painter.end()
 
@@ -238,37 +291,77 @@ class Theme(object):
         self.margins = margins or px(20)
         self._font = font or self.default_font
         self.colors = dict(self.default_colors, **colors)
+        self._brush_cache = {}
+        self._pen_cache = {}
+        self._fm_cache = {}
+        self._text_size_cache = {}
+
+    def set_color(self, name, color):
+        '''Set a theme color, dropping pens and brushes built from the old.'''
+        self.colors[name] = color
+        self._brush_cache.clear()
+        self._pen_cache.clear()
+
+    def _pen(self, color, width, style):
+        key = (color, width, style)
+        pen = self._pen_cache.get(key)
+        if pen is None:
+            pen = QtGui.QPen(self.fill(color), width, style)
+            self._pen_cache[key] = pen
+        return pen
 
     def solid(self, color='white', width=1):
-        return QtGui.QPen(self.colors[color], width, QtCore.Qt.SolidLine)
+        return self._pen(color, width, QtCore.Qt.SolidLine)
 
     def dotted(self, color='white', width=1):
-        return QtGui.QPen(self.colors[color], width, QtCore.Qt.DotLine)
+        return self._pen(color, width, QtCore.Qt.DotLine)
 
     def fill(self, color='active'):
-        return QtGui.QBrush(self.colors[color])
+        brush = self._brush_cache.get(color)
+        if brush is None:
+            brush = QtGui.QBrush(self.colors[color])
+            self._brush_cache[color] = brush
+        return brush
 
     def font(self, family='Sans Serif', size=-1, weight=-1):
         if family == 'Sans Serif' and size < 0 and weight < 0:
             return self._font
         return QtGui.QFont(family, size, weight)
 
+    def font_metrics(self, font):
+        key = font.key()
+        fm = self._fm_cache.get(key)
+        if fm is None:
+            fm = QtGui.QFontMetrics(font)
+            self._fm_cache[key] = fm
+        return fm
+
+    def text_size(self, font, text):
+        '''Cached (width, height) of text's bounding rect in font.'''
+        key = (font.key(), text)
+        size = self._text_size_cache.get(key)
+        if size is None:
+            rect = self.font_metrics(font).boundingRect(text)
+            size = (rect.width(), rect.height())
+            self._text_size_cache[key] = size
+        return size
+
     def text_width(self, font, text):
-        return QtGui.QFontMetrics(font).boundingRect(text).width()
+        return self.text_size(font, text)[0]
 
     def text_height(self, font, text):
-        return QtGui.QFontMetrics(font).boundingRect(text).height()
+        return self.text_size(font, text)[1]
 
 
 def precision():
     '''Returns the current manipulation precision based on key modifiers.'''
 
-    modifiers = QtWidgets.QApplication.instance().keyboardModifiers()
-    if modifiers & QtCore.Qt.ShiftModifier:
-        return 10
-    if modifiers & QtCore.Qt.ControlModifier:
-        return 50
-    return 1
+    mods = _app().keyboardModifiers()
+    return (
+        10 if mods & QtCore.Qt.ShiftModifier else
+        50 if mods & QtCore.Qt.ControlModifier else
+        1
+    )
 
 
 class WidgetGroup(object):
@@ -280,6 +373,62 @@ class WidgetGroup(object):
         self.active = None
         self.active_idx = 0
         self.hovering = None
+        self._widget_set = set(self.widgets)
+        self._index_map = {w: i for i, w in enumerate(self.widgets)}
+        self._bounds_dirty = True
+        self._cached_bounds = []
+        self._zoom_bounds = []
+        self._zoom_strip = QtCore.QRect()
+        self._bounds_map = {}
+
+    def _reindex(self, start=0):
+        for i in range(start, len(self.widgets)):
+            self._index_map[self.widgets[i]] = i
+        if self.active is not None:
+            self.active_idx = self._index_map[self.active]
+        self._bounds_dirty = True
+
+    def invalidate_bounds(self):
+        '''Mark cached widget bounds as stale. Call when the region changes.'''
+        self._bounds_dirty = True
+
+    def _hit_order(self):
+        '''Widgets paired with their bounds, highest hit priority first.
+
+        Within a priority, widgets painted last (topmost) are tested first.
+
+        ZoomManipulators are kept apart in _zoom_bounds so the whole strip
+        of previews can be rejected with a single rect test.
+        '''
+        if self._bounds_dirty:
+            ordered = sorted(
+                reversed(self.widgets),
+                key=lambda w: w.hit_priority,
+            )
+            self._cached_bounds = []
+            self._zoom_bounds = []
+            self._zoom_strip = QtCore.QRect()
+            for w in ordered:
+                bounds = w.bounds()
+                if isinstance(w, ZoomManipulator):
+                    self._zoom_bounds.append((w, bounds))
+                    self._zoom_strip = self._zoom_strip.united(bounds)
+                else:
+                    self._cached_bounds.append((w, bounds))
+            self._bounds_map = dict(self._cached_bounds + self._zoom_bounds)
+            self._bounds_dirty = False
+        return self._cached_bounds
+
+    def widget_at_pos(self, pos):
+        region_bounds = self._hit_order()
+        # Zoom previews paint over the region so they are tested first
+        if self._zoom_strip.contains(pos):
+            for widget, bounds in self._zoom_bounds:
+                if bounds.contains(pos):
+                    return widget
+        for widget, bounds in region_bounds:
+            if bounds.contains(pos):
+                return widget
 
     def extend(self, widgets):
         for w in widgets:
@@ -288,22 +437,41 @@ class WidgetGroup(object):
     def append(self, widget):
         if not isinstance(widget, Widget):
             raise ValueError('widget expected got %s' % type(widget))
-        if widget in self.widgets:
+        if widget in self._widget_set:
             return
+        self._index_map[widget] = len(self.widgets)
         self.widgets.append(widget)
+        self._widget_set.add(widget)
+        self._bounds_dirty = True
 
     def remove(self, widget):
-        self.widgets.remove(widget)
+        if widget not in self._widget_set:
+            raise ValueError('widget not in group: %s' % widget)
+        index = self._index_map.pop(widget)
+        self._widget_set.remove(widget)
+        del self.widgets[index]
+        if widget is self.active:
+            self.clear_selection()
+        self._reindex(index)
 
     def insert(self, index, widget):
         if not isinstance(widget, Widget):
             raise ValueError('widget expected got %s' % type(widget))
-        if widget in self.widgets:
+        if widget in self._widget_set:
             return
         self.widgets.insert(index, widget)
+        self._widget_set.add(widget)
+        self._reindex(max(0, min(index, len(self.widgets) - 1)))
 
     def hit(self, widget, pos):
-        return widget.bounds().contains(pos)
+        self._hit_order()
+        bounds = self._bounds_map.get(widget)
+        if bounds is None:
+            # Not in this group, so nothing cached for it
+            bounds = widget.bounds()
+        if bounds is NotImplemented:
+            return False
+        return bounds.contains(pos)
 
     def key_up(self):
         if self.active:
@@ -332,61 +500,89 @@ class WidgetGroup(object):
     def select_next(self):
         if not self.active:
             self.select(self.widgets[0])
-        elif self.active == self.widgets[-1]:
+            return
+        i = self.active_idx + 1
+        if i >= len(self.widgets):
             self.clear_selection()
         else:
-            self.select(self.widgets[self.widgets.index(self.active) + 1])
+            self.select(self.widgets[i])
 
     def select_prev(self):
         if not self.active:
             self.select(self.widgets[-1])
-        elif self.active == self.widgets[0]:
+            return
+        i = self.active_idx - 1
+        if i < 0:
             self.clear_selection()
         else:
-            self.select(self.widgets[self.widgets.index(self.active) - 1])
+            self.select(self.widgets[i])
 
     def clear_selection(self):
+        # Only the tracked active widget can be flagged active
+        if self.active is not None:
+            self.active.active = False
         self.active = None
-        for widget in self.widgets:
-            widget.active = False
 
     def select(self, widget):
         self.clear_selection()
         self.active = widget
-        self.active_idx = self.widgets.index(widget)
+        self.active_idx = self._index_map[widget]
         widget.active = True
 
     def select_at_pos(self, pos):
         self.clear_selection()
-        for widget in self.widgets:
-            if self.hit(widget, pos):
-                widget.active = True
-                self.active = widget
-                return widget
+        widget = self.widget_at_pos(pos)
+        if widget:
+            widget.active = True
+            self.active = widget
+            self.active_idx = self._index_map[widget]
+            return widget
 
     def clear_hovering(self):
+        # Only the tracked hovering widget can be flagged hovering
+        if self.hovering is not None:
+            self.hovering.hovering = False
         self.hovering = None
-        for widget in self.widgets:
-            widget.hovering = False
 
     def hover(self, widget):
         self.clear_hovering()
-        self.hover = widget
-        widget.hover = True
+        self.hovering = widget
+        widget.hovering = True
 
     def hover_at_pos(self, pos):
-        self.clear_hovering()
-        for widget in self.widgets:
-            if self.hit(widget, pos):
-                widget.hovering = True
-                self.hovering = widget
-                return widget
+        widget = self.widget_at_pos(pos)
+        if widget is not None and widget is self.hovering:
+            return widget
 
-    def paint(self, painter):
+        self.clear_hovering()
+        if widget:
+            widget.hovering = True
+            self.hovering = widget
+            return widget
+
+    def paint(self, painter, region=None):
+        '''Paint all widgets, skipping those entirely outside of region.
+
+        region may be a QRect or a QRegion.
+        '''
+
+        # Widgets set the pen and brush they draw with, so reset only once
+        # and restore the caller's painter state at the group boundary
+        self._hit_order()
+        painter.save()
+        painter.setBrush(_NO_BRUSH)
+        painter.setPen(_NO_PEN)
         for widget in self.widgets:
-            painter.setBrush(QtCore.Qt.NoBrush)
-            painter.setPen(QtCore.Qt.NoPen)
+            bounds = self._bounds_map[widget]
+            if bounds is NotImplemented or bounds.isEmpty():
+                continue
+            if (
+                region is not None and widget.paints_within_bounds and
+                not region.intersects(bounds.adjusted(-2, -2, 2, 2))
+            ):
+                continue
             widget.paint(painter)
+        painter.restore()
 
 
 class Widget(QtCore.QObject):
@@ -396,6 +592,10 @@ class Widget(QtCore.QObject):
     pressed = QtCore.Signal()
     released = QtCore.Signal()
     toggled = QtCore.Signal(bool)
+    hit_priority = 0
+    # Whether paint stays within bounds, allowing it to be skipped when
+    # bounds are outside of the area being repainted
+    paints_within_bounds = True
 
     def __init__(self, parent):
         super(Widget, self).__init__(parent)
@@ -426,20 +626,27 @@ class Widget(QtCore.QObject):
         self.parent.region = rect
 
     def limit(self, x, y):
+        # Inlined clip - called on every drag event
+        canvas = self.canvas
         return (
-            clip(x, 0, self.canvas.width()),
-            clip(y, 0, self.canvas.height()),
+            min(max(0, x), canvas.width()),
+            min(max(0, y), canvas.height()),
         )
 
     def limit_center(self, x, y):
-        min_x = ceil(self.region.width() * 0.5)
-        max_x = self.canvas.width() - min_x
-        min_y = ceil(self.region.height() * 0.5)
-        max_y = self.canvas.height() - min_y
-        return clip(x, min_x, max_x), clip(y, min_y, max_y)
+        canvas = self.canvas
+        region = self.region
+        min_x = (region.width() + 1) // 2
+        max_x = canvas.width() - min_x
+        min_y = (region.height() + 1) // 2
+        max_y = canvas.height() - min_y
+        return min(max(min_x, x), max_x), min(max(min_y, y), max_y)
 
     def normalize_region(self):
-        self.region = self.region.normalized()
+        region = self.region
+        # Only inverted rects change when normalized, skip the copy otherwise
+        if region.width() < 0 or region.height() < 0:
+            self.region = region.normalized()
 
     def move(self, x, y):
         return NotImplemented
@@ -507,65 +714,105 @@ class ZoomManipulator(Manipulator):
     the corner of the rect when arrow keys are pressed.
     '''
 
-    def __init__(self, parent, pixmap, corner, pos, rect):
+    # Offsets applied to each corner to correct for borders
+    corner_corrections = dict(
+        topLeft=QtCore.QPoint(-1, -1),
+        topRight=QtCore.QPoint(0, -1),
+        bottomRight=QtCore.QPoint(0, 0),
+        bottomLeft=QtCore.QPoint(-1, 0),
+    )
+    # Box edges the two corner lines run to from the box center
+    corner_lines = dict(
+        topLeft=(QtCore.QRect.right, QtCore.QRect.bottom),
+        topRight=(QtCore.QRect.left, QtCore.QRect.bottom),
+        bottomRight=(QtCore.QRect.left, QtCore.QRect.top),
+        bottomLeft=(QtCore.QRect.right, QtCore.QRect.top),
+    )
+    # Render hints disabled around 1:1 pixmap blits
+    blit_hints = (
+        QtGui.QPainter.Antialiasing |
+        QtGui.QPainter.SmoothPixmapTransform
+    )
+
+    def __init__(self, parent, pixmap, corner, pos, rect, image=None):
         super(ZoomManipulator, self).__init__(parent)
         self.corner = corner
-        self._pixmap = pixmap
+        self._get_corner, self._set_corner = rect_accessors(corner)
         self._pos = pos
         self._rect = rect
-        self._corner_pos = None
-        self._pixmap_cropped = None
+        self._preview = None
+        self._rendered = None
+        self.set_pixmap(pixmap, image)
 
-    def set_pixmap(self, pixmap):
-        self._pixmap_cropped = None
+    def set_pixmap(self, pixmap, image=None):
+        '''Set the source pixmap. Pass image to reuse a QImage conversion.'''
         self._pixmap = pixmap
+        self._image = pixmap.toImage() if image is None else image
+        if self._preview is None:
+            # Box sized preview reused for every corner position
+            self._preview = QtGui.QPixmap(self._rect.size())
+        self._preview_key = None
+        self._rendered_key = None
 
     @property
     def pixmap(self):
-        if (
-            not self._pixmap_cropped or
-            self.corner_pos_corrected != self._corner_pos
-        ):
-            self._corner_pos = self.corner_pos_corrected
-            self._pixmap_cropped = self._pixmap.copy(self.corner_rect)
-        return self._pixmap_cropped.scaled(100, 100)
+        '''Zoomed corner preview at box size, rebuilt when the corner moves.'''
+        cp = self.corner_pos_corrected
+        key = (cp.x(), cp.y())
+        if key != self._preview_key:
+            # Scale straight from the CPU side image into the pooled
+            # preview, without copying the crop or smoothing pixels.
+            source = self.rect_around(cp)
+            clipped = source.intersected(self._image.rect())
+            sx = self._rect.width() / float(source.width())
+            sy = self._rect.height() / float(source.height())
+            target = QtCore.QRectF(
+                (clipped.x() - source.x()) * sx,
+                (clipped.y() - source.y()) * sy,
+                clipped.width() * sx,
+                clipped.height() * sy,
+            )
+            # Off desktop pixels are black, like QImage.copy
+            self._preview.fill(QtCore.Qt.black)
+            painter = QtGui.QPainter(self._preview)
+            painter.setRenderHint(painter.SmoothPixmapTransform, False)
+            if not clipped.isEmpty():
+                painter.drawImage(target, self._image, QtCore.QRectF(clipped))
+            painter.end()
+            self._preview_key = key
+        return self._preview
 
     @property
     def corner_pos_corrected(self):
         '''Corner position corrected for borders - fixes zoom previews.'''
-        pos = getattr(self.parent.region, self.corner)()
-        if self.corner == 'topLeft':
-            pos += QtCore.QPoint(-1, -1)
-        elif self.corner == 'topRight':
-            pos += QtCore.QPoint(0, -1)
-        elif self.corner == 'bottomLeft':
-            pos += QtCore.QPoint(-1, 0)
-        return pos
+        return self.corner_pos + self.corner_corrections[self.corner]
 
     @property
     def corner_pos(self):
         '''Corner position of parent region.'''
-        return getattr(self.parent.region, self.corner)()
+        return self._get_corner(self.parent.region)
 
     @property
     def corner_rect(self):
         '''Rect around corner position of parent region.'''
-        rect = QtCore.QRect(0, 0, 10, 10)
-        rect.moveCenter(QtCore.QPoint(self.corner_pos_corrected))
-        return rect
+        return self.rect_around(self.corner_pos_corrected)
+
+    @staticmethod
+    def rect_around(pos):
+        '''10x10 rect centered on pos, matching QRect.moveCenter.'''
+        return QtCore.QRect(pos.x() - 4, pos.y() - 4, 10, 10)
 
     @property
     def pos(self):
         return self._pos
 
     def move(self, x, y):
-        self.set(self.corner_pos.x() + x, self.corner_pos.y() + y)
+        pos = self.corner_pos
+        self.set(pos.x() + x, pos.y() + y)
 
     def set(self, x, y):
         x, y = self.limit(x, y)
-        method = 'set' + self.corner[0].upper() + self.corner[1:]
-        set_ = getattr(self.region, method)
-        set_(QtCore.QPoint(x, y))
+        self._set_corner(self.region, QtCore.QPoint(x, y))
         self.normalize_region()
 
     def bounds(self):
@@ -580,51 +827,65 @@ class ZoomManipulator(Manipulator):
 
     def get_lines(self, box):
         center = box.center()
-        right = box.right()
-        top = box.top()
-        left = box.left()
-        bottom = box.bottom()
-        if self.corner == 'topLeft':
-            return [
-                QtCore.QLine(center, QtCore.QPoint(right, center.y())),
-                QtCore.QLine(center, QtCore.QPoint(center.x(), bottom))
-            ]
-        if self.corner == 'topRight':
-            return [
-                QtCore.QLine(center, QtCore.QPoint(left, center.y())),
-                QtCore.QLine(center, QtCore.QPoint(center.x(), bottom))
-            ]
-        if self.corner == 'bottomRight':
-            return [
-                QtCore.QLine(center, QtCore.QPoint(left, center.y())),
-                QtCore.QLine(center, QtCore.QPoint(center.x(), top))
-            ]
-        if self.corner == 'bottomLeft':
-            return [
-                QtCore.QLine(center, QtCore.QPoint(right, center.y())),
-                QtCore.QLine(center, QtCore.QPoint(center.x(), top))
-            ]
+        x_edge, y_edge = self.corner_lines[self.corner]
+        return [
+            QtCore.QLine(center, QtCore.QPoint(x_edge(box), center.y())),
+            QtCore.QLine(center, QtCore.QPoint(center.x(), y_edge(box))),
+        ]
 
     def get_box(self):
         rect = QtCore.QRect(self._rect)
         rect.moveCenter(self.pos)
         return rect
 
-    def paint(self, painter):
-        box = self.get_box()
+    def render(self, painter, box, pen):
         lines = self.get_lines(box)
-        painter.drawPixmap(box, self.pixmap)
-        if self.active:
-            painter.setPen(self.theme.solid('active'))
-        elif self.hovering:
-            painter.setPen(self.theme.solid('hover'))
-        else:
-            painter.setPen(self.theme.solid('inactive'))
+        # The preview is already box sized so this is a 1:1 blit, keep the
+        # outline antialiased but never smooth or antialias the pixels
+        hints = painter.renderHints()
+        painter.setRenderHints(self.blit_hints, False)
+        painter.drawPixmap(box.topLeft(), self.pixmap)
+        painter.setRenderHints(hints)
+        painter.setBrush(_NO_BRUSH)
+        painter.setPen(pen)
         # Draw outline
         painter.drawRect(box)
         # Draw corner lines
         painter.drawLines(lines)
 
+    def paint(self, painter):
+        box = self.get_box()
+        if self.active:
+            pen = self.theme.solid('active')
+        elif self.hovering:
+            pen = self.theme.solid('hover')
+        else:
+            pen = self.theme.solid('inactive')
+
+        # Reuse the last rendered frame while the corner and state are still
+        cp = self.corner_pos_corrected
+        dpr = painter.device().devicePixelRatioF()
+        key = (cp.x(), cp.y(), box.x(), box.y(), pen, dpr)
+        if key != self._rendered_key:
+            # Leave room for the outline drawn on and just past the box edge
+            frame = box.adjusted(-1, -1, 2, 2)
+            size = frame.size() * dpr
+            if self._rendered is None or self._rendered.size() != size:
+                # Device pixel sized so HiDPI outlines are not upscaled
+                self._rendered = QtGui.QPixmap(size)
+                self._rendered.setDevicePixelRatio(dpr)
+            self._rendered.fill(QtCore.Qt.transparent)
+            offscreen = QtGui.QPainter(self._rendered)
+            offscreen.setRenderHints(painter.renderHints())
+            offscreen.translate(-frame.topLeft())
+            self.render(offscreen, box, pen)
+            offscreen.end()
+            self._rendered_key = key
+        hints = painter.renderHints()
+        painter.setRenderHints(self.blit_hints, False)
+        painter.drawPixmap(box.topLeft() - QtCore.QPoint(1, 1), self._rendered)
+        painter.setRenderHints(hints)
+
 
 class CornerManipulator(Manipulator):
     '''Corner manipulator widget.
@@ -636,19 +897,19 @@ class CornerManipulator(Manipulator):
     def __init__(self, parent, corner='topLeft'):
         super(CornerManipulator, self).__init__(parent)
         self.corner = corner
+        self._get_corner, self._set_corner = rect_accessors(corner)
 
     @property
     def pos(self):
-        return getattr(self.parent.region, self.corner)()
+        return self._get_corner(self.parent.region)
 
     def move(self, x, y):
-        self.set(self.pos.x() + x, self.pos.y() + y)
+        pos = self.pos
+        self.set(pos.x() + x, pos.y() + y)
 
     def set(self, x, y):
         x, y = self.limit(x, y)
-        method = 'set' + self.corner[0].upper() + self.corner[1:]
-        set_ = getattr(self.region, method)
-        set_(QtCore.QPoint(x, y))
+        self._set_corner(self.region, QtCore.QPoint(x, y))
         self.normalize_region()
 
     def bounds(self):
@@ -682,42 +943,37 @@ class SideManipulator(Manipulator):
     def __init__(self, parent, side='top'):
         super(SideManipulator, self).__init__(parent)
         self.side = side
+        self.horizontal = side in ('top', 'bottom')
+        self.vertical = side in ('left', 'right')
+        self._get_side, self._set_side = rect_accessors(side)
 
     @property
     def pos(self):
-        coord = getattr(self.region, self.side)()
+        region = self.region
+        coord = self._get_side(region)
         if self.horizontal:
-            return QtCore.QPoint(self.region.center().x(), coord)
+            return QtCore.QPoint(region.center().x(), coord)
         else:
-            return QtCore.QPoint(coord, self.region.center().y())
-
-    @property
-    def horizontal(self):
-        return self.side in ('top', 'bottom')
-
-    @property
-    def vertical(self):
-        return self.side in ('left', 'right')
+            return QtCore.QPoint(coord, region.center().y())
 
     @property
     def width(self):
-        return (20, ceil(self.region.width() * 0.9))[self.horizontal]
+        return (20, (self.region.width() * 9 + 9) // 10)[self.horizontal]
 
     @property
     def height(self):
-        return (20, ceil(self.region.height() * 0.9))[self.vertical]
+        return (20, (self.region.height() * 9 + 9) // 10)[self.vertical]
 
     def xy_to_coord(self, x, y):
         return (x, y)[self.horizontal]
 
     def move(self, x, y):
-        self.set(self.pos.x() + x, self.pos.y() + y)
+        pos = self.pos
+        self.set(pos.x() + x, pos.y() + y)
 
     def set(self, x, y):
         x, y = self.limit(x, y)
-        method = 'set' + self.side.title()
-        set_ = getattr(self.region, method)
-        set_(self.xy_to_coord(x, y))
+        self._set_side(self.region, self.xy_to_coord(x, y))
         self.normalize_region()
 
     def bounds(self):
@@ -740,11 +996,11 @@ class SideManipulator(Manipulator):
 
     def get_box(self):
         if self.horizontal:
-            width = ceil(self.width * 0.5)
+            width = (self.width + 1) // 2
             height = 10
         else:
             width = 10
-            height = ceil(self.height * 0.5)
+            height = (self.height + 1) // 2
 
         rect = QtCore.QRect(0, 0, width, height)
         rect.moveCenter(self.pos)
@@ -769,106 +1025,74 @@ class MoveManipulator(Manipulator):
     dragged or when the arrow keys are pressed.
     '''
 
+    # Covers most of the region so test it after the smaller handles
+    hit_priority = 1
+    # Outlines the whole region and may push arrows outside of it
+    paints_within_bounds = False
 
-    alt_arrows = [
-        QtGui.QPolygon.fromList([
-            QtCore.QPoint(20, -10),
-            QtCore.QPoint(40, -10),
-            QtCore.QPoint(40, -18),
-            QtCore.QPoint(60, 0),
-            QtCore.QPoint(40, 18),
-            QtCore.QPoint(40, 10),
-            QtCore.QPoint(20, 10),
-            QtCore.QPoint(20, -10),
-        ]),
-        QtGui.QPolygon.fromList([
-            QtCore.QPoint(10, 20),
-            QtCore.QPoint(10, 40),
-            QtCore.QPoint(18, 40),
-            QtCore.QPoint(0, 60),
-            QtCore.QPoint(-18, 40),
-            QtCore.QPoint(-10, 40),
-            QtCore.QPoint(-10, 20),
-            QtCore.QPoint(10, 20),
-        ]),
-        QtGui.QPolygon.fromList([
-            QtCore.QPoint(-20, 10),
-            QtCore.QPoint(-40, 10),
-            QtCore.QPoint(-40, 18),
-            QtCore.QPoint(-60, 0),
-            QtCore.QPoint(-40, -18),
-            QtCore.QPoint(-40, -10),
-            QtCore.QPoint(-20, -10),
-            QtCore.QPoint(-20, 10),
-        ]),
-        QtGui.QPolygon.fromList([
-            QtCore.QPoint(-10, -20),
-            QtCore.QPoint(-10, -40),
-            QtCore.QPoint(-18, -40),
-            QtCore.QPoint(0, -60),
-            QtCore.QPoint(18, -40),
-            QtCore.QPoint(10, -40),
-            QtCore.QPoint(10, -20),
-            QtCore.QPoint(-10, -20),
-        ])
-    ]
-
+    # Arrow heads as x, y pairs relative to the widget center
     arrows = [
-        QtGui.QPolygon.fromList([
-            QtCore.QPoint(40, -18),
-            QtCore.QPoint(60, 0),
-            QtCore.QPoint(40, 18),
-        ]),
-        QtGui.QPolygon.fromList([
-            QtCore.QPoint(18, 40),
-            QtCore.QPoint(0, 60),
-            QtCore.QPoint(-18, 40),
-        ]),
-        QtGui.QPolygon.fromList([
-            QtCore.QPoint(-40, 18),
-            QtCore.QPoint(-60, 0),
-            QtCore.QPoint(-40, -18),
-        ]),
-        QtGui.QPolygon.fromList([
-            QtCore.QPoint(-18, -40),
-            QtCore.QPoint(0, -60),
-            QtCore.QPoint(18, -40),
-        ]),
+        QtGui.QPolygon([QtCore.QPoint(x, y) for x, y in points])
+        for points in (
+            ((40, -18), (60, 0), (40, 18)),
+            ((18, 40), (0, 60), (-18, 40)),
+            ((-40, 18), (-60, 0), (-40, -18)),
+            ((-18, -40), (0, -60), (18, -40)),
+        )
     ]
+    arrow_bounds = list(map(QtGui.QPolygon.boundingRect, arrows))
+    # Furthest any arrow reaches past the region edge or center
+    arrow_extent = max(
+        max(abs(b.left()), abs(b.right()), abs(b.top()), abs(b.bottom()))
+        for b in arrow_bounds
+    )
+    # Arrows are axis aligned so their directions are known up front
+    arrow_normals = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+
+    def __init__(self, parent):
+        super(MoveManipulator, self).__init__(parent)
+        self._arrows_cache = None
+        self._arrows_key = None
 
     @property
     def pos(self):
         return self.region.center()
 
     def get_arrows(self):
-        center = self.parent.region.center()
-        xform = QtGui.QTransform()
-        xform.translate(center.x(), center.y())
+        region = self.parent.region
+        center = region.center()
+        key = (center.x(), center.y(), region.width(), region.height())
+        if key == self._arrows_key and self._arrows_cache is not None:
+            return self._arrows_cache
+
         arrows = []
-        for arrow in self.arrows:
-            moved_arrow = xform.map(arrow)
-            if not self.parent.region.contains(moved_arrow.boundingRect()):
-                N = normalize(arrow[1])
-                if N.x():
-                    N *= self.parent.region.width() * 0.5
-                else:
-                    N *= self.parent.region.height() * 0.5
-                cform = QtGui.QTransform()
-                cform.translate(N.x(), N.y())
-                moved_arrow = cform.map(moved_arrow)
-            arrows.append(moved_arrow)
+        cx, cy = center.x(), center.y()
+        width, height = region.width(), region.height()
+        for arrow, bounds, (nx, ny) in zip(
+            self.arrows, self.arrow_bounds, self.arrow_normals
+        ):
+            dx, dy = cx, cy
+            if not region.contains(bounds.translated(cx, cy)):
+                # Integer form of qRound(n * size * 0.5), as toPoint rounds
+                dx += (nx * width + 1) // 2
+                dy += (ny * height + 1) // 2
+            arrows.append(arrow.translated(dx, dy))
+
+        self._arrows_cache = arrows
+        self._arrows_key = key
         return arrows
 
     @property
     def width(self):
-        return ceil(self.region.width() * 0.9)
+        return (self.region.width() * 9 + 9) // 10
 
     @property
     def height(self):
-        return ceil(self.region.height() * 0.9)
+        return (self.region.height() * 9 + 9) // 10
 
     def move(self, x, y):
-        self.set(self.pos.x() + x, self.pos.y() + y)
+        pos = self.pos
+        self.set(pos.x() + x, pos.y() + y)
 
     def set(self, x, y):
         x, y = self.limit_center(x, y)
@@ -881,13 +1105,13 @@ class MoveManipulator(Manipulator):
         return rect
 
     def paint(self, painter):
-        painter.setPen(QtCore.Qt.NoPen)
+        painter.setPen(_NO_PEN)
         if self.active:
             painter.setBrush(self.theme.fill('active'))
             for arrow in self.get_arrows():
                 painter.drawPolygon(arrow)
 
-            painter.setBrush(QtCore.Qt.NoBrush)
+            painter.setBrush(_NO_BRUSH)
             painter.setPen(self.theme.solid('active'))
             painter.drawRect(self.region)
         elif self.hovering:
@@ -895,11 +1119,11 @@ class MoveManipulator(Manipulator):
             for arrow in self.get_arrows():
                 painter.drawPolygon(arrow)
 
-            painter.setBrush(QtCore.Qt.NoBrush)
+            painter.setBrush(_NO_BRUSH)
             painter.setPen(self.theme.solid('hover'))
             painter.drawRect(self.region)
         else:
-            painter.setBrush(QtCore.Qt.NoBrush)
+            painter.setBrush(_NO_BRUSH)
             painter.setPen(self.theme.solid('inactive'))
             painter.drawRect(self.region)
 
@@ -910,27 +1134,29 @@ class Text(Widget):
     Text
     '''
 
+    # Has no hit area, bounds do not cover the painted text
+    paints_within_bounds = False
 
     def __init__(self, parent, text, pos):
         super(Text, self).__init__(parent)
         self.text = text
         self.font = self.theme.font(size=16, weight=75)
         self._pos = pos
+        self._text_w, self._text_h = self.theme.text_size(self.font, text)
+        # Text and font are fixed, so lay out the baseline once
+        self._text_pos = QtCore.QPoint(pos.x(), pos.y() + self._text_h)
 
     @property
     def pos(self):
-        height = self.theme.text_height(self.font, self.text)
-        return QtCore.QPoint(self._pos.x(), self._pos.y() + height)
+        return QtCore.QPoint(self._text_pos)
 
     def bounds(self):
         return QtCore.QRect(-1, -1, 1, 1)
 
     def paint(self, painter):
-        painter.setPen(QtCore.Qt.NoPen)
-        painter.setBrush(QtCore.Qt.NoBrush)
         painter.setPen(self.theme.solid('active'))
         painter.setFont(self.font)
-        painter.drawText(self.pos, self.text)
+        painter.drawText(self._text_pos, self.text)
 
 
 class Button(Widget):
@@ -945,55 +1171,56 @@ class Button(Widget):
         self.text = text
         self.font = self.theme.font(size=16, weight=50)
         self._pos = pos
+        self._text_w, self._text_h = self.theme.text_size(self.font, text)
+        # Text and font are fixed, so lay out the box once
+        height = self._text_h + self.theme.margins
+        width = self._text_w + self.theme.margins * 2
+        self._box = QtCore.QRect(pos.x(), pos.y() + height, width, height)
 
     @property
     def pos(self):
-        height = self.theme.text_height(self.font, self.text)
-        height += self.theme.margins
-        return QtCore.QPoint(self._pos.x(), self._pos.y() + height)
+        return self._box.topLeft()
 
     def get_box(self):
-        height = self.theme.text_height(self.font, self.text)
-        height += self.theme.margins
-        width = self.theme.text_width(self.font, self.text)
-        width += self.theme.margins * 2
-        return QtCore.QRect(self.pos.x(), self.pos.y(), width, height)
+        return QtCore.QRect(self._box)
 
     def bounds(self):
         return self.get_box()
 
     def paint(self, painter):
-        box = self.get_box()
-        painter.setPen(QtCore.Qt.NoPen)
-        painter.setBrush(QtCore.Qt.NoBrush)
+        box = self._box
+        painter.setBrush(_NO_BRUSH)
         painter.setPen(self.theme.solid('active'))
         painter.setFont(self.font)
-        painter.drawText(box, QtCore.Qt.AlignCenter, self.text)
+        painter.drawText(box, _ALIGN_CENTER, self.text)
         painter.drawRect(box)
 
 
+OptionsGeometry = namedtuple(
+    'OptionsGeometry',
+    'box bounds arrows arrow_rects',
+)
+
+
 class Options(Widget):
     '''An Options widget.
 
     < | option | >
     '''
 
+    # Arrow heads as x, y pairs relative to their box edge
     arrows = [
-        QtGui.QPolygon.fromList([
-            QtCore.QPoint(-10, 18),
-            QtCore.QPoint(-30, 0),
-            QtCore.QPoint(-10, -18),
-        ]),
-        QtGui.QPolygon.fromList([
-            QtCore.QPoint(10, -18),
-            QtCore.QPoint(30, 0),
-            QtCore.QPoint(10, 18),
-        ]),
+        QtGui.QPolygon([QtCore.QPoint(x, y) for x, y in points])
+        for points in (
+            ((-10, 18), (-30, 0), (-10, -18)),
+            ((10, -18), (30, 0), (10, 18)),
+        )
     ]
     optionChanged = QtCore.Signal(int)
 
     def __init__(self, parent, default_text, options, width, pos):
         super(Options, self).__init__(parent)
+        self._option_texts = []
         self.default_text = default_text
         self.width = width
         self.text = default_text
@@ -1001,86 +1228,205 @@ class Options(Widget):
             options.insert(0, None)
         self.options = options
         self.option = 0
+        self._postpone_depth = 0
+        self._postpone_start = None
+        self._static_text = None
+        self._static_text_key = None
         self.font = self.theme.font(size=16, weight=50)
         self._pos = pos
+        self._invalidate_geometry()
+
+    def _invalidate_geometry(self):
+        '''Clear the cached geometry. Call after changing _pos.'''
+        self._geometry = None
+
+    def get_geometry(self):
+        '''Box, bounds and arrows laid out together, cached until invalid.
+
+        The returned rects and polygons are shared with the cache and must
+        be treated as read-only, the other getters return copies.
+        '''
+
+        if self._geometry is None:
+            height = self.theme.text_height(self.font, self.default_text)
+            height += self.theme.margins
+            pos = self.pos
+            box = QtCore.QRect(pos.x(), pos.y(), self.width, height)
+            cy = box.center().y()
+            arrows = (
+                self.arrows[0].translated(box.left(), cy),
+                self.arrows[1].translated(box.right(), cy),
+            )
+            self._geometry = OptionsGeometry(
+                box=box,
+                # Widen the box to include the arrows on either side
+                bounds=box.adjusted(-40, 0, 40, 0),
+                arrows=arrows,
+                arrow_rects=tuple(arrow.boundingRect() for arrow in arrows),
+            )
+        return self._geometry
+
+    @property
+    def default_text(self):
+        return self._default_text
+
+    @default_text.setter
+    def default_text(self, value):
+        self._default_text = value
+        self._invalidate_geometry()
+        if self._option_texts:
+            self._option_texts[0] = value
+
+    @property
+    def options(self):
+        return self._options
+
+    @options.setter
+    def options(self, value):
+        self._options = value
+        self._option_texts = [self.default_text] + [
+            '%sx%s' % (size.width(), size.height())
+            for size in value[1:]
+        ]
+
+    @property
+    def width(self):
+        return self._width
+
+    @width.setter
+    def width(self, value):
+        self._width = value
+        self._invalidate_geometry()
+
+    @property
+    def font(self):
+        return self._font
+
+    @font.setter
+    def font(self, value):
+        self._font = value
+        self._invalidate_geometry()
+
+    @contextmanager
+    def postpone_signals(self):
+        '''Collapse optionChanged emissions within the block into one.
+
+        Blocks may be nested. The outermost block emits the final option
+        on exit, even when the block raises, and only if it differs from
+        the option on entry::
+
+            with options.postpone_signals():
+                options.key_right()
+                options.key_right()
+        '''
+
+        if not self._postpone_depth:
+            self._postpone_start = self.option
+        self._postpone_depth += 1
+        try:
+            yield
+        finally:
+            self._postpone_depth -= 1
+            if (
+                not self._postpone_depth and
+                self.option != self._postpone_start
+            ):
+                self.optionChanged.emit(self.option)
+
+    def _option_changed(self):
+        if not self._postpone_depth:
+            self.optionChanged.emit(self.option)
 
     def key_left(self):
         next_option = self.option - 1
-        if 0 <= next_option:
-            self.option = next_option
-            self.optionChanged = QtCore.Signal(int)
-        self.text_from_option(self.option)
+        if next_option < 0:
+            return
+        self.option = next_option
+        self.text_from_option(next_option)
+        self._option_changed()
 
     def key_right(self):
         next_option = self.option + 1
-        if next_option < len(self.options):
-            self.option = next_option
-            self.optionChanged = QtCore.Signal(int)
-        self.text_from_option(self.option)
+        if next_option >= len(self.options):
+            return
+        self.option = next_option
+        self.text_from_option(next_option)
+        self._option_changed()
 
     def text_from_option(self, option):
-        if option == 0:
-            self.text = self.default_text
-        else:
-            size = self.options[option]
-            self.text = '%sx%s' % (size.width(), size.height())
+        self.text = self._option_texts[option]
+
+    def get_static_text(self):
+        '''QStaticText for the current text, laid out once per text.'''
+
+        key = (self.text, self.font.key())
+        if self._static_text is None or key != self._static_text_key:
+            static_text = QtGui.QStaticText(self.text)
+            static_text.setTextFormat(QtCore.Qt.PlainText)
+            static_text.prepare(QtGui.QTransform(), self.font)
+            self._static_text = static_text
+            self._static_text_key = key
+        return self._static_text
 
     def press(self, pos):
         super(Options, self).press(pos)
-        left, right = self.get_arrows()
-        if left.boundingRect().contains(pos):
+        left, right = self.get_geometry().arrow_rects
+        if left.contains(pos):
             self.key_left()
-        if right.boundingRect().contains(pos):
+        elif right.contains(pos):
             self.key_right()
 
     @property
     def pos(self):
-        height = self.theme.text_height(self.font, self.default_text)
-        height += self.theme.margins
         return QtCore.QPoint(self._pos.x() + 52, self._pos.y())
 
     def get_arrows(self):
-        box = self.get_box()
-        left = QtGui.QTransform()
-        left.translate(box.left(), box.center().y())
-        right = QtGui.QTransform()
-        right.translate(box.right(), box.center().y())
-        return [left.map(self.arrows[0]), right.map(self.arrows[1])]
+        return [QtGui.QPolygon(a) for a in self.get_geometry().arrows]
+
+    def get_arrow_rects(self):
+        '''Bounding rects of the arrows, used for hit testing.'''
+        return [QtCore.QRect(r) for r in self.get_geometry().arrow_rects]
 
     def get_box(self):
-        height = self.theme.text_height(self.font, self.default_text)
-        height += self.theme.margins
-        return QtCore.QRect(self.pos.x(), self.pos.y(), self.width, height)
+        return QtCore.QRect(self.get_geometry().box)
 
     def bounds(self):
-        box = self.get_box()
-        box.setLeft(box.left() - 40)
-        box.setRight(box.right() + 40)
-        return box
+        return QtCore.QRect(self.get_geometry().bounds)
 
     def paint(self, painter):
-        box = self.get_box()
-        painter.setPen(QtCore.Qt.NoPen)
-        painter.setBrush(QtCore.Qt.NoBrush)
+        geometry = self.get_geometry()
+        box = geometry.box
+        state = (
+            'active' if self.active else
+            'hover' if self.hovering else
+            'inactive'
+        )
+        # Theme caches these, looking them up here follows set_color
+        painter.setPen(self.theme.solid(state))
+        # drawRect fills with the current brush, so this one is needed
+        painter.setBrush(_NO_BRUSH)
         painter.setFont(self.font)
-        if self.active:
-            painter.setPen(self.theme.solid('active'))
-        elif self.hovering:
-            painter.setPen(self.theme.solid('hover'))
-        else:
-            painter.setPen(self.theme.solid('inactive'))
 
-        painter.drawText(box, QtCore.Qt.AlignCenter, self.text)
+        # Center the prepared text in the box, like AlignCenter. Unlike
+        # drawText, drawStaticText does not clip, so clip to the box here.
+        static_text = self.get_static_text()
+        size = static_text.size()
+        painter.save()
+        painter.setClipRect(box, QtCore.Qt.IntersectClip)
+        painter.drawStaticText(
+            QtCore.QPointF(
+                box.x() + (box.width() - size.width()) * 0.5,
+                box.y() + (box.height() - size.height()) * 0.5,
+            ),
+            static_text,
+        )
+        painter.restore()
         painter.drawRect(box)
 
-        if self.active:
-            painter.setBrush(self.theme.fill('active'))
-        elif self.hovering:
-            painter.setBrush(self.theme.fill('hover'))
-        else:
-            painter.setBrush(self.theme.fill('inactive'))
-        for arrow in self.get_arrows():
-            painter.drawPolygon(arrow)
+        left, right = geometry.arrows
+        painter.setBrush(self.theme.fill(state))
+        painter.drawPolygon(left)
+        painter.drawPolygon(right)
 
 
 class Confirm(QtWidgets.QDialog):
@@ -1095,7 +1441,7 @@ class Confirm(QtWidgets.QDialog):
         self.button_no = QtWidgets.QPushButton(reject, self)
         self.button_no.clicked.connect(self.reject)
         self.label_img = QtWidgets.QLabel(self)
-        self.label_img.setPixmap(self.pixmap)
+        self.label_img.setPixmap(self.preview(self.pixmap))
 
         self.layout_buttons = QtWidgets.QHBoxLayout()
         self.layout_buttons.setAlignment(QtCore.Qt.AlignRight)
@@ -1109,33 +1455,124 @@ class Confirm(QtWidgets.QDialog):
         self.setLayout(self.layout)
         self.setWindowTitle(title)
 
+    def setPixmap(self, pixmap):
+        '''Replace the previewed pixmap so the dialog can be reused.'''
+
+        self.pixmap = pixmap
+        self.label_img.setPixmap(self.preview(pixmap))
+        self.adjustSize()
+
+    def preview(self, pixmap):
+        '''Downscale pixmap to fit on screen, the full pixmap is kept.'''
+
+        screen = _app().primaryScreen().availableGeometry()
+        max_size = screen.size() * 0.8
+        # The screen size is logical, compare against the pixmap's logical
+        # size and keep the device pixels when scaling down
+        dpr = pixmap.devicePixelRatio()
+        size = pixmap.size() / dpr
+        if (
+            size.width() <= max_size.width() and
+            size.height() <= max_size.height()
+        ):
+            return pixmap
+        preview = pixmap.scaled(
+            max_size * dpr,
+            QtCore.Qt.KeepAspectRatio,
+            QtCore.Qt.SmoothTransformation,
+        )
+        preview.setDevicePixelRatio(dpr)
+        return preview
+
 
 # Helper functions
 
+def rect_accessors(name):
+    '''Get the unbound QRect getter and setter for a corner or side name.'''
+    setter = 'set' + name[0].upper() + name[1:]
+    return getattr(QtCore.QRect, name), getattr(QtCore.QRect, setter)
+
+
+def subtract_rect(rect, hole):
+    '''Get the non-empty bands of rect left uncovered by hole.
+
+    hole must be contained within rect or be empty.
+    '''
+
+    if hole.isEmpty():
+        return [rect]
+
+    bands = [
+        # Top and bottom span the full width of rect
+        QtCore.QRect(
+            rect.left(), rect.top(),
+            rect.width(), hole.top() - rect.top()
+        ),
+        QtCore.QRect(
+            rect.left(), hole.bottom() + 1,
+            rect.width(), rect.bottom() - hole.bottom()
+        ),
+        # Left and right span only the height of hole
+        QtCore.QRect(
+            rect.left(), hole.top(),
+            hole.left() - rect.left(), hole.height()
+        ),
+        QtCore.QRect(
+            hole.right() + 1, hole.top(),
+            rect.right() - hole.right(), hole.height()
+        ),
+    ]
+    return [band for band in bands if not band.isEmpty()]
+
+
 def clip(value, minimum, maximum):
     return min(max(minimum, value), maximum)
 
 
 def normalize(qpoint):
-    length = sqrt((qpoint.x() * qpoint.x()) + (qpoint.y() * qpoint.y()))
-    return QtCore.QPoint(qpoint.x() / length, qpoint.y() / length)
+    length = hypot(qpoint.x(), qpoint.y())
+    if length == 0:
+        return QtCore.QPointF(0, 0)
+    return QtCore.QPointF(qpoint.x() / length, qpoint.y() / length)
 
 
 # DPI Aware scaling #
 
+_dpi_cache = None
+_factor_cache = None
+
+
+def invalidate_dpi_cache(*args):
+    '''Clear the cached DPI, connected to the app's screen change signals.'''
+    global _dpi_cache, _factor_cache
+    _dpi_cache = None
+    _factor_cache = None
+
+
 def dpi():
     '''Get screen DPI to scale UI independent of monitor size.'''
-    return float(get_event_loop().desktop().logicalDpiX())
+    global _dpi_cache
+    if _dpi_cache is None:
+        screen = get_event_loop().primaryScreen()
+        if screen is None:
+            # Headless, fall back to the unscaled DPI without caching it
+            return 96.0
+        _dpi_cache = float(screen.logicalDotsPerInchX())
+    return _dpi_cache
 
 
 def factor():
     '''Get UI scale factor'''
-    return dpi() / 96.0
+    global _factor_cache
+    if _factor_cache is None:
+        _factor_cache = dpi() / 96.0
+    return _factor_cache
 
 
 def px(value):
     '''Scale a pixel value based on screen dpi.'''
-    return int(factor() * value)
+    # Read the cached factor directly, only call factor() to fill it
+    return int((_factor_cache or factor()) * value)
 
 
 # Functional API #
@@ -1147,18 +1584,36 @@ class EventLoop(object):
     instance = None
 
 
-def get_event_loop():
-    '''Get the QApplication event loop.'''
+def _set_event_loop(qapp):
+    '''Store qapp on EventLoop and keep the DPI cache in sync with it.'''
 
-    if EventLoop.instance:
-        return EventLoop.instance
+    EventLoop.instance = qapp
+    if qapp is not None:
+        qapp.screenAdded.connect(invalidate_dpi_cache)
+        qapp.screenRemoved.connect(invalidate_dpi_cache)
+        qapp.primaryScreenChanged.connect(invalidate_dpi_cache)
+        qapp.screenRemoved.connect(invalidate_capture_cache)
+        qapp.primaryScreenChanged.connect(invalidate_capture_cache)
 
-    qapp = QtWidgets.QApplication.instance()
-    if not qapp:
-        EventLoop.standalone = True
-        qapp = QtWidgets.QApplication([])
 
-    EventLoop.instance = qapp
+def _app():
+    '''Get the running QApplication, caching it on EventLoop.'''
+
+    if EventLoop.instance is None:
+        _set_event_loop(QtWidgets.QApplication.instance())
+    return EventLoop.instance
+
+
+def get_event_loop():
+    '''Get the QApplication event loop.'''
+
+    if EventLoop.instance is None:
+        qapp = QtWidgets.QApplication.instance()
+        if not qapp:
+            EventLoop.standalone = True
+            qapp = QtWidgets.QApplication([])
+        _set_event_loop(qapp)
+    return EventLoop.instance
 
 
 def confirm(pixmap, title='Confirm?', reject='Cancel', accept='Accept'):
@@ -1177,21 +1632,79 @@ def confirm(pixmap, title='Confirm?', reject='Cancel', accept='Accept'):
     return Confirm(pixmap, title, reject, accept).exec_()
 
 
+_primary_screen = None
+_root_winid = None
+
+
+def invalidate_capture_cache(*args):
+    '''Forget the cached primary screen, connected to screen change signals.'''
+    global _primary_screen, _root_winid
+    _primary_screen = None
+    _root_winid = None
+
+
 def capture_region(region=None):
     '''Capture and a region of your desktop across all monitors.'''
 
+    global _primary_screen, _root_winid
     loop = get_event_loop()
+    if _primary_screen is None:
+        _primary_screen = loop.primaryScreen()
+        _root_winid = loop.desktop().winId()
 
     if region is None:
-        region = loop.primaryScreen().virtualGeometry()
-
-    pixmap = loop.primaryScreen().grabWindow(
-        loop.desktop().winId(),
-        region.x(),
-        region.y(),
-        region.width(),
-        region.height()
-    )
+        region = _primary_screen.virtualGeometry()
+
+    # Find the part of each screen the region covers
+    parts = []
+    for screen in loop.screens():
+        part = screen.geometry().intersected(region)
+        if not part.isEmpty():
+            parts.append((part, screen))
+    dprs = set(screen.devicePixelRatio() for part, screen in parts)
+
+    if len(dprs) != 1:
+        # Off every screen, or across screens of different scales. Qt5's
+        # grabWindow scales x and y by the screen's factor without
+        # subtracting the screen's origin, so per screen grabs would come
+        # from the wrong place. Grab through the primary screen as a whole.
+        return _primary_screen.grabWindow(
+            _root_winid,
+            region.x(),
+            region.y(),
+            region.width(),
+            region.height()
+        )
+
+    # Every part shares one scale, so logical coordinates map to native
+    # ones by that factor alone and each screen grabs only its part
+    dpr = dprs.pop()
+    parts = [
+        (
+            part,
+            screen.grabWindow(
+                _root_winid,
+                part.x(),
+                part.y(),
+                part.width(),
+                part.height()
+            ),
+        )
+        for part, screen in parts
+    ]
+
+    if len(parts) == 1 and parts[0][0] == region:
+        return parts[0][1]
+
+    # Composite the parts in logical coordinates at the screens' scale,
+    # gaps between screens of different sizes are left black
+    pixmap = QtGui.QPixmap(region.size() * dpr)
+    pixmap.setDevicePixelRatio(dpr)
+    pixmap.fill(QtCore.Qt.black)
+    painter = QtGui.QPainter(pixmap)
+    for part, grab in parts:
+        painter.drawPixmap(part.translated(-region.topLeft()), grab)
+    painter.end()
     return pixmap
 
 
@@ -1227,6 +1740,36 @@ def select_and_capture(region=None, font=None, colors=None):
     return capture_region(region)
 
 
+def write_stdout(pixmap, format='PNG', quality=-1):
+    '''Encode a pixmap directly to stdout's file descriptor.
+
+    Falls back to writing an in memory buffer through sys.stdout when
+    stdout has no usable file descriptor.
+    '''
+
+    sys.stdout.flush()
+    stdout = QtCore.QFile()
+    try:
+        opened = stdout.open(
+            sys.stdout.fileno(),
+            QtCore.QIODevice.WriteOnly | QtCore.QIODevice.Unbuffered,
+        )
+    except (AttributeError, ValueError, OSError):
+        opened = False
+
+    if opened:
+        pixmap.save(stdout, format, quality)
+        stdout.close()
+        return
+
+    byte_array = QtCore.QByteArray()
+    buffer = QtCore.QBuffer(byte_array)
+    buffer.open(QtCore.QIODevice.WriteOnly)
+    pixmap.save(buffer, format, quality)
+    sys.stdout.buffer.write(byte_array.data())
+    sys.stdout.flush()
+
+
 def main():
     '''CLI interface'''
 
@@ -1253,35 +1796,48 @@ def main():
         action='store_true',
         help='Confirm the resulting pixmap using a simple dialog.',
     )
+    parser.add_argument(
+        '--compress',
+        action='store_true',
+        help='Use full PNG compression. Smaller files but slower to write.',
+    )
 
     args = parser.parse_args()
 
+    # Qt maps PNG quality q to zlib level (100 - q) * 9 / 91, so 80 is
+    # level 1 - much faster to encode for full screen captures.
+    png_quality = -1 if args.compress else 80
+
     region = select()
-    if args.confirm:
-        while not confirm(capture_region(region)):
+    pixmap = None
+    if args.confirm and region is not None:
+        pixmap = capture_region(region)
+        dialog = Confirm(pixmap, 'Confirm?', 'Cancel', 'Accept')
+        while not dialog.exec_():
             region = select(region)
+            if region is None:
+                break
+            pixmap = capture_region(region)
+            dialog.setPixmap(pixmap)
 
     if region is None:
         sys.exit(1)
 
     if args.measure:
         print('%sx%s' % (region.width(), region.height()))
+        if not args.save:
+            # Only the size was requested - skip grabbing pixels
+            return
 
-    pixmap = capture_region(region)
+    if pixmap is None:
+        pixmap = capture_region(region)
     if args.save:
-        pixmap.save(args.save)
-    elif args.measure:
-        return
+        if args.save.lower().endswith('.png'):
+            pixmap.save(args.save, None, png_quality)
+        else:
+            pixmap.save(args.save)
     else:
-        from io import BytesIO
-        byte_array = QtCore.QByteArray()
-        buffer = QtCore.QBuffer(byte_array)
-        buffer.open(QtCore.QIODevice.WriteOnly)
-        pixmap.save(buffer, 'PNG')
-        string_io = BytesIO(byte_array.data())
-        string_io.seek(0)
-        sys.stdout.buffer.write(string_io.read())
-        sys.stdout.flush()
+        write_stdout(pixmap, 'PNG', png_quality)
 
     sys.exit()
 